@@ -1,23 +1,62 @@
 import datetime
+import hashlib
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
-from itertools import groupby, product
-from pathlib import Path
-from typing import Dict, Iterator, List
+from functools import lru_cache, partial
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
 
 import bson
 import numpy as np
 from monty.json import MSONable
-from monty.serialization import loadfn
 from pydantic import BaseModel
 from pymatgen.analysis.structure_matcher import ElementComparator, StructureMatcher
+from pymatgen.core.composition import Composition
 from pymatgen.core.structure import Structure
-from typing_extensions import Literal
 
 from emmet.core import SETTINGS
 
+_MAX_INTERN_KEY_LENGTH = 64
+
+# Marks the stack frame where jsanitize is done with a container's children
+_EXIT_FRAME = object()
+
+# Keys are a 16 byte digest and symprec, so even a full cache is only a few MB
+_SG_CACHE_MAXSIZE = 50000
+_SG_CACHE: Dict[Tuple[bytes, float], int] = {}
+_SG_CACHE_LOCK = threading.Lock()
+
 
 def get_sg(struc, symprec=SETTINGS.SYMPREC) -> int:
     """helper function to get spacegroup with a loose tolerance"""
+    # Magnetic moments can enter the symmetry analysis but aren't part of the cache key
+    if not isinstance(struc, Structure) or "magmom" in struc.site_properties:
+        return _get_sg(struc, symprec)
+
+    # Repeated structures, including ones spglib fails on, are only analyzed once
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(struc.lattice.matrix.tobytes())
+    digest.update(struc.frac_coords.tobytes())
+    digest.update(",".join(site.species_string for site in struc).encode())
+    key = (digest.digest(), symprec)
+
+    sg = _SG_CACHE.get(key)
+    if sg is None:
+        sg = _get_sg(struc, symprec)
+        with _SG_CACHE_LOCK:
+            if len(_SG_CACHE) >= _SG_CACHE_MAXSIZE:
+                # Evict the oldest entry
+                _SG_CACHE.pop(next(iter(_SG_CACHE)), None)
+            _SG_CACHE[key] = sg
+
+    return sg
+
+
+def _get_sg(struc, symprec: float) -> int:
+    """helper function to get spacegroup, returning -1 if spglib fails"""
     try:
         return struc.get_space_group_info(symprec=symprec)[1]
     except Exception:
@@ -30,6 +69,7 @@ def group_structures(
     stol: float = SETTINGS.STOL,
     angle_tol: float = SETTINGS.ANGLE_TOL,
     symprec: float = SETTINGS.SYMPREC,
+    nproc: int = 1,
 ) -> Iterator[List[Structure]]:
     """
     Groups structures according to space group and structure matching
@@ -40,9 +80,84 @@ def group_structures(
         stol (float): StructureMatcher tuning parameter for matching tasks to materials
         angle_tol (float): StructureMatcher tuning parameter for matching tasks to materials
         symprec (float): symmetry tolerance for space group finding
+        nproc (int): number of processes to structure match the space group groups with
+    """
+
+    # First group by spacegroup number, then by composition so single structures
+    # skip the StructureMatcher, then by structure matching.
+    # Space groups are computed once per structure and carried through the sort
+    decorated = sorted(
+        ((get_sg(struc, symprec=symprec), struc) for struc in structures),
+        key=itemgetter(0),
+    )
+    buckets = []
+    for _, pregroup in groupby(decorated, key=itemgetter(0)):
+        buckets.extend(_group_by_composition(struc for _, struc in pregroup))
+
+    to_match = [bucket for bucket in buckets if len(bucket) > 1]
+    match = partial(_match_structures, ltol=ltol, stol=stol, angle_tol=angle_tol)
+
+    if nproc > 1 and len(to_match) > 1:
+        with ProcessPoolExecutor(max_workers=nproc) as executor:
+            yield from _merge_matches(buckets, executor.map(match, to_match))
+    else:
+        yield from _merge_matches(buckets, map(match, to_match))
+
+
+def _group_by_composition(structures: Iterable[Structure]) -> List[List[Structure]]:
+    """
+    Buckets structures by element composition, ordered by the same
+    ElementComparator hash that StructureMatcher.group_structures sorts on
+    so the groups come out in the same order as matching the whole space group
+    """
+    comparator = ElementComparator()
+    buckets: Dict[Composition, List[Structure]] = {}
+    for struc in structures:
+        buckets.setdefault(comparator.get_hash(struc.composition), []).append(struc)
+    return [buckets[key] for key in sorted(buckets)]
+
+
+def _merge_matches(
+    buckets: List[List[Structure]], matches: Iterator[List[List[int]]]
+) -> Iterator[List[Structure]]:
+    """
+    Yields groups in bucket order, mapping the index groups for multi-structure
+    buckets from matches back onto the bucket and yielding single structure buckets
+    directly
+    """
+    for bucket in buckets:
+        if len(bucket) > 1:
+            for group in next(matches):
+                yield [bucket[i] for i in group]
+        else:
+            yield bucket
+
+
+def _match_structures(
+    structures: List[Structure], ltol: float, stol: float, angle_tol: float
+) -> List[List[int]]:
+    """
+    Groups structures by structure matching
+    Returns groups of indices into structures so worker processes only send back
+    positions and the caller keeps its own Structure objects
     """
+    sm = _get_structure_matcher(ltol=ltol, stol=stol, angle_tol=angle_tol)
+    index = {id(struc): i for i, struc in enumerate(structures)}
+    return [
+        [index[id(struc)] for struc in group]
+        for group in sm.group_structures(structures)
+    ]
 
-    sm = StructureMatcher(
+
+@lru_cache()
+def _get_structure_matcher(
+    ltol: float, stol: float, angle_tol: float
+) -> StructureMatcher:
+    """
+    Builds the StructureMatcher once per set of tolerances (and per process)
+    rather than once per group of structures
+    """
+    return StructureMatcher(
         ltol=ltol,
         stol=stol,
         angle_tol=angle_tol,
@@ -53,14 +168,6 @@ def group_structures(
         comparator=ElementComparator(),
     )
 
-    def _get_sg(struc):
-        return get_sg(struc, symprec=symprec)
-
-    # First group by spacegroup number then by structure matching
-    for _, pregroup in groupby(sorted(structures, key=_get_sg), key=_get_sg):
-        for group in sm.group_structures(list(pregroup)):
-            yield group
-
 
 def jsanitize(obj, strict=False, allow_bson=False):
     """
@@ -83,48 +190,122 @@ def jsanitize(obj, strict=False, allow_bson=False):
     Returns:
         Sanitized dict that can be json serialized.
     """
+    # Explicit work stack of (container, key, value) frames rather than recursion
+    # so deeply nested documents don't hit the recursion limit
+    root: List = [None]
+    stack = [(root, 0, obj)]
+    # ids of the containers on the path to the current frame, to catch cycles
+    path: Set[int] = set()
+
+    while stack:
+        container, key, value = stack.pop()
+        if container is _EXIT_FRAME:
+            # All of this container's children are done, so it leaves the path
+            path.discard(key)
+            continue
+
+        sanitizer = _SANITIZERS.get(type(value), _sanitize_node)
+        container[key], children = sanitizer(value, strict, allow_bson)
+        if children:
+            if id(value) in path:
+                raise ValueError("circular reference")
+            path.add(id(value))
+            # The exit frame also keeps value alive so its id can't be reused
+            stack.append((_EXIT_FRAME, id(value), value))
+            # Reversed so children are processed and assigned in their original order
+            stack.extend(reversed(children))
+
+    return root[0]
+
+
+def _sanitize_sequence(obj, strict, allow_bson):
+    """Creates the sanitized list for a sequence and the frames to fill it"""
+    sanitized = [None] * len(obj)
+    return sanitized, [(sanitized, i, v) for i, v in enumerate(obj)]
+
+
+def _sanitize_mapping(obj, strict, allow_bson):
+    """Creates the sanitized dict for a mapping and the frames to fill it"""
+    sanitized: Dict = {}
+    children = []
+    for k, v in obj.items():
+        if type(k) is not str:
+            k = k.__str__()
+        # Intern short keys so documents sharing a schema share their key strings
+        if type(k) is str and len(k) < _MAX_INTERN_KEY_LENGTH:
+            k = sys.intern(k)
+        sanitized[k] = None
+        children.append((sanitized, k, v))
+    return sanitized, children
+
+
+def _sanitize_passthrough(obj, strict, allow_bson):
+    """Returns JSON-native scalars as is"""
+    return obj, None
+
+
+def _sanitize_array(obj, strict, allow_bson):
+    """Converts numpy arrays, in bulk for numeric dtypes"""
+    # tolist() already yields native bools, ints and floats for these dtypes
+    if obj.dtype.kind in "biuf":
+        return obj.tolist(), None
+    return _sanitize_sequence(obj.tolist(), strict, allow_bson)
+
+
+def _sanitize_node(obj, strict, allow_bson):
+    """
+    Sanitizes a single node for jsanitize
+
+    Returns:
+        Tuple of the sanitized value and a list of (container, key, value) frames
+        for children that still need to be sanitized into that value
+    """
     if allow_bson and (
         isinstance(obj, (datetime.datetime, bytes))
         or (bson is not None and isinstance(obj, bson.objectid.ObjectId))
     ):
-        return obj
+        return obj, None
     if isinstance(obj, (list, tuple)):
-        return [jsanitize(i, strict=strict, allow_bson=allow_bson) for i in obj]
+        return _sanitize_sequence(obj, strict, allow_bson)
     if np is not None and isinstance(obj, np.ndarray):
-        return [
-            jsanitize(i, strict=strict, allow_bson=allow_bson) for i in obj.tolist()
-        ]
+        return _sanitize_array(obj, strict, allow_bson)
     if isinstance(obj, Enum):
-        return obj.value
+        return obj.value, None
     if isinstance(obj, dict):
-        return {
-            k.__str__(): jsanitize(v, strict=strict, allow_bson=allow_bson)
-            for k, v in obj.items()
-        }
+        return _sanitize_mapping(obj, strict, allow_bson)
     if isinstance(obj, MSONable):
-        return {
-            k.__str__(): jsanitize(v, strict=strict, allow_bson=allow_bson)
-            for k, v in obj.as_dict().items()
-        }
+        return _sanitize_mapping(obj.as_dict(), strict, allow_bson)
 
     if isinstance(obj, BaseModel):
-        return {
-            k.__str__(): jsanitize(v, strict=strict, allow_bson=allow_bson)
-            for k, v in obj.dict().items()
-        }
+        return _sanitize_mapping(obj.dict(), strict, allow_bson)
     if isinstance(obj, (int, float)):
-        return obj
+        return obj, None
 
     if obj is None:
-        return None
+        return None, None
 
     if not strict:
-        return obj.__str__()
+        return obj.__str__(), None
 
     if isinstance(obj, str):
-        return obj.__str__()
+        return obj.__str__(), None
+
+    return _sanitize_node(obj.as_dict(), strict, allow_bson)
+
 
-    return jsanitize(obj.as_dict(), strict=strict, allow_bson=allow_bson)
+# Exact-type dispatch for the common scalars and containers, everything else
+# goes through the isinstance checks in _sanitize_node
+_SANITIZERS = {
+    str: _sanitize_passthrough,
+    int: _sanitize_passthrough,
+    float: _sanitize_passthrough,
+    bool: _sanitize_passthrough,
+    type(None): _sanitize_passthrough,
+    list: _sanitize_sequence,
+    tuple: _sanitize_sequence,
+    dict: _sanitize_mapping,
+    np.ndarray: _sanitize_array,
+}
 
 
 class ValueEnum(Enum):
@@ -1,20 +1,9 @@
 """ Module to define various calculation types as Enums for VASP """
-import datetime
-from itertools import groupby, product
+import json
+from itertools import product
 from pathlib import Path
-from typing import Dict, Iterator, List
 
-import bson
-import numpy as np
-from monty.json import MSONable
 from monty.serialization import loadfn
-from pydantic import BaseModel
-from pymatgen.analysis.structure_matcher import ElementComparator, StructureMatcher
-from pymatgen.core.structure import Structure
-from typing_extensions import Literal
-
-from emmet.core import SETTINGS
-from emmet.core.utils import ValueEnum
 
 _RUN_TYPE_DATA = loadfn(str(Path(__file__).parent.joinpath("run_types.yaml").resolve()))
 _TASK_TYPES = [
@@ -55,26 +44,24 @@ class {enum_name}(ValueEnum):
     return header + "\n".join(items)
 
 
+# Maps the characters that aren't valid in Enum member names to underscores
+_NAME_TABLE = str.maketrans(" +-", "___")
+
 run_type_enum = get_enum_source(
     "RunType",
     "VASP calculation run types",
-    dict(
-        {
-            "_".join(rt.split()).replace("+", "_").replace("-", "_"): rt
-            for rt in _RUN_TYPES
-        }
-    ),
+    {rt.translate(_NAME_TABLE): rt for rt in _RUN_TYPES},
 )
 task_type_enum = get_enum_source(
     "TaskType",
     "VASP calculation task types",
-    {"_".join(tt.split()): tt for tt in _TASK_TYPES},
+    {tt.translate(_NAME_TABLE): tt for tt in _TASK_TYPES},
 )
 calc_type_enum = get_enum_source(
     "CalcType",
     "VASP calculation types",
     {
-        f"{'_'.join(rt.split()).replace('+','_').replace('-','_')}_{'_'.join(tt.split())}": f"{rt} {tt}"
+        f"{rt.translate(_NAME_TABLE)}_{tt.translate(_NAME_TABLE)}": f"{rt} {tt}"
         for rt, tt in product(_RUN_TYPES, _TASK_TYPES)
     },
 )
@@ -96,3 +83,8 @@ from emmet.core.utils import ValueEnum
     f.write("\n\n")
     f.write(calc_type_enum)
     f.write("\n")
+
+# JSON copy of run_types.yaml for fast loading in calc_types.utils
+with open(Path(__file__).parent / "run_types.json", "w") as f:
+    json.dump(_RUN_TYPE_DATA, f, indent=2)
+    f.write("\n")
@@ -1,22 +1,69 @@
 """ Module to define various calculation types as Enums for VASP """
-import datetime
-from itertools import groupby, product
+import json
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterator, List
+from typing import Dict, Tuple
 
-import bson
-import numpy as np
-from monty.json import MSONable
 from monty.serialization import loadfn
-from pydantic import BaseModel
-from pymatgen.analysis.structure_matcher import ElementComparator, StructureMatcher
-from pymatgen.core.structure import Structure
 from typing_extensions import Literal
 
-from emmet.core import SETTINGS
 from emmet.core.vasp.calc_types.enums import RunType, TaskType, CalcType
 
-_RUN_TYPE_DATA = loadfn(str(Path(__file__).parent.joinpath("run_types.yaml").resolve()))
+
+@lru_cache(maxsize=None)
+def _load_run_types(path: str) -> Dict:
+    """
+    Loads and caches the run type definitions
+    Prefers the JSON copy written by generate.py since it parses much faster than
+    the YAML, falling back to the YAML if the JSON is missing
+    """
+    try:
+        with open(Path(path).with_suffix(".json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return loadfn(path)
+
+
+def _norm(value):
+    """
+    helper function to normalize strings for comparison
+    """
+    if isinstance(value, str):
+        return value.strip().upper()
+    return value
+
+
+_RUN_TYPE_DATA = _load_run_types(
+    str(Path(__file__).parent.joinpath("run_types.yaml").resolve())
+)
+
+# Flattened (functional_class, special_type, ((param, value), ...)) rules
+# This is to force an order of evaluation
+_RUN_TYPE_RULES = [
+    (
+        functional_class,
+        special_type,
+        tuple((param, _norm(value)) for param, value in params.items()),
+    )
+    for functional_class in ["HF", "VDW", "METAGGA", "GGA"]
+    for special_type, params in _RUN_TYPE_DATA[functional_class].items()
+]
+
+# Only these parameters can influence the run type, so they form the cache key
+_RUN_TYPE_PARAMS = tuple(
+    sorted({param for _, _, rule in _RUN_TYPE_RULES for param, _ in rule})
+)
+
+# Only these INCAR tags can influence the task type, so they form the cache key
+_TASK_TYPE_INCAR_KEYS = (
+    "ICHARG",
+    "LEPSILON",
+    "IBRION",
+    "LCHIMAG",
+    "LEFG",
+    "NSW",
+    "ISIF",
+)
 
 
 def run_type(parameters: Dict) -> RunType:
@@ -28,32 +75,26 @@ def run_type(parameters: Dict) -> RunType:
         parameters: Dictionary of VASP parameters from Vasprun.xml
     """
 
-    if parameters.get("LDAU", False):
-        is_hubbard = "+U"
-    else:
-        is_hubbard = ""
+    norm_params = tuple(_norm(parameters.get(param)) for param in _RUN_TYPE_PARAMS)
+
+    return _run_type(norm_params, bool(parameters.get("LDAU", False)))
+
+
+@lru_cache(maxsize=4096)
+def _run_type(norm_params: Tuple, is_hubbard: bool) -> RunType:
+    """
+    Cached run_type lookup keyed on the normalized values of the parameters
+    referenced in the run type rules, ordered as in _RUN_TYPE_PARAMS
+    """
 
-    def _variant_equal(v1, v2) -> bool:
-        """
-        helper function to deal with strings
-        """
-        if isinstance(v1, str) and isinstance(v2, str):
-            return v1.strip().upper() == v2.strip().upper()
-        else:
-            return v1 == v2
+    hubbard = "+U" if is_hubbard else ""
+    params = dict(zip(_RUN_TYPE_PARAMS, norm_params))
 
-    # This is to force an order of evaluation
-    for functional_class in ["HF", "VDW", "METAGGA", "GGA"]:
-        for special_type, params in _RUN_TYPE_DATA[functional_class].items():
-            if all(
-                [
-                    _variant_equal(parameters.get(param, None), value)
-                    for param, value in params.items()
-                ]
-            ):
-                return RunType(f"{special_type}{is_hubbard}")
+    for _, special_type, rule in _RUN_TYPE_RULES:
+        if all(params[param] == value for param, value in rule):
+            return RunType(f"{special_type}{hubbard}")
 
-    return RunType(f"LDA{is_hubbard}")
+    return RunType(f"LDA{hubbard}")
 
 
 def task_type(
@@ -66,49 +107,70 @@ def task_type(
         inputs: inputs dict with an incar, kpoints, potcar, and poscar dictionaries
     """
 
-    calc_type = []
-
     incar = inputs.get("incar", {})
 
+    has_kpt_labels = False
     if incar.get("ICHARG", 0) > 10:
         try:
             kpts = inputs.get("kpoints") or {}
             kpt_labels = kpts.get("labels") or []
-            num_kpt_labels = len(list(filter(None.__ne__, kpt_labels)))
+            has_kpt_labels = any(label is not None for label in kpt_labels)
         except Exception as e:
             raise Exception(
                 "Couldn't identify total number of kpt labels: {}".format(e)
             )
 
-        if num_kpt_labels > 0:
-            calc_type.append("NSCF Line")
-        else:
-            calc_type.append("NSCF Uniform")
+    incar_items = tuple((k, incar[k]) for k in _TASK_TYPE_INCAR_KEYS if k in incar)
+
+    return _task_type(incar_items, has_kpt_labels)
+
+
+@lru_cache(maxsize=4096)
+def _task_type(incar_items: Tuple, has_kpt_labels: bool) -> TaskType:
+    """
+    Cached task_type lookup keyed on the INCAR tags in _TASK_TYPE_INCAR_KEYS
+    """
+
+    incar = dict(incar_items)
+    icharg = incar.get("ICHARG", 0)
+    lepsilon = incar.get("LEPSILON", False)
+    ibrion = incar.get("IBRION", 0)
+    lchimag = incar.get("LCHIMAG", False)
+    lefg = incar.get("LEFG", False)
+    nsw = incar.get("NSW", 1)
+    # No default: an unset ISIF is neither a structure optimization nor a deformation
+    isif = incar.get("ISIF")
+
+    if icharg > 10:
+        if has_kpt_labels:
+            return TaskType.NSCF_Line
+        return TaskType.NSCF_Uniform
 
-    elif incar.get("LEPSILON", False):
-        if incar.get("IBRION", 0) > 6:
-            calc_type.append("DFPT")
-        calc_type.append("Dielectric")
+    if lepsilon:
+        if ibrion > 6:
+            return TaskType.DFPT_Dielectric
+        return TaskType.Dielectric
 
-    elif incar.get("IBRION", 0) > 6:
-        calc_type.append("DFPT")
+    if ibrion > 6:
+        return TaskType.DFPT
 
-    elif incar.get("LCHIMAG", False):
-        calc_type.append("NMR Nuclear Shielding")
+    if lchimag:
+        return TaskType.NMR_Nuclear_Shielding
 
-    elif incar.get("LEFG", False):
-        calc_type.append("NMR Electric Field Gradient")
+    if lefg:
+        return TaskType.NMR_Electric_Field_Gradient
 
-    elif incar.get("NSW", 1) == 0:
-        calc_type.append("Static")
+    if nsw == 0:
+        return TaskType.Static
 
-    elif incar.get("ISIF", 2) == 3 and incar.get("IBRION", 0) > 0:
-        calc_type.append("Structure Optimization")
+    if isif == 3 and ibrion > 0:
+        return TaskType.Structure_Optimization
 
-    elif incar.get("ISIF", 3) == 2 and incar.get("IBRION", 0) > 0:
-        calc_type.append("Deformation")
+    if isif == 2 and ibrion > 0:
+        return TaskType.Deformation
 
-    return TaskType(" ".join(calc_type))
+    # Unrecognized inputs have no task type, let the Enum raise its usual ValueError
+    return TaskType("")
 
 
 def calc_type(
@@ -122,6 +184,12 @@ def calc_type(
         inputs: inputs dict with an incar, kpoints, potcar, and poscar dictionaries
         parameters: Dictionary of VASP parameters from Vasprun.xml
     """
-    rt = run_type(parameters).value
-    tt = task_type(inputs).value
-    return CalcType(f"{rt} {tt}")
+    return _calc_type(run_type(parameters), task_type(inputs))
+
+
+@lru_cache(maxsize=4096)
+def _calc_type(rt: RunType, tt: TaskType) -> CalcType:
+    """
+    Cached calc_type lookup from the run type and task type
+    """
+    return CalcType(f"{rt.value} {tt.value}")
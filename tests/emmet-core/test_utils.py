@@ -8,7 +8,9 @@ import numpy as np
 import pytest
 from bson.objectid import ObjectId
 from monty.json import MSONable
+from pymatgen.core import Lattice, Structure
 
+import emmet.core.utils
 from emmet.core.utils import get_sg, group_structures, jsanitize, ValueEnum, DocEnum
 
 
@@ -46,6 +48,17 @@ def test_jsanitize():
     assert clean["a"] == ["b", [1, 2, 3]]
     assert isinstance(clean["b"], str)
 
+    d = {
+        "float": np.array([[1.5, 2.0], [3.0, 4.0]]),
+        "bool": np.array([True, False]),
+        "complex": np.array([1 + 2j]),
+    }
+    clean = jsanitize(d)
+    assert clean["float"] == [[1.5, 2.0], [3.0, 4.0]]
+    assert type(clean["float"][0][0]) is float
+    assert clean["bool"] == [True, False]
+    assert clean["complex"] == ["(1+2j)"]
+
     rnd_bin = bytes(np.random.rand(10))
     d = {"a": bytes(rnd_bin)}
     clean = jsanitize(d, allow_bson=True)
@@ -53,6 +66,101 @@ def test_jsanitize():
     assert isinstance(clean["a"], bytes)
 
 
+def test_get_sg():
+    nacl = Structure.from_spacegroup(
+        "Fm-3m", Lattice.cubic(5.69), ["Na", "Cl"], [[0, 0, 0], [0.5, 0.5, 0.5]]
+    )
+    assert get_sg(nacl) == 225
+    assert get_sg(nacl.copy()) == 225
+
+    cscl = Structure.from_spacegroup(
+        "Pm-3m", Lattice.cubic(4.12), ["Cs", "Cl"], [[0, 0, 0], [0.5, 0.5, 0.5]]
+    )
+    assert get_sg(cscl) == 221
+
+
+def test_get_sg_cache(monkeypatch):
+    calls = []
+
+    def _failing_sg_info(self, symprec=0.01, angle_tolerance=5.0):
+        calls.append(self)
+        raise ValueError("spglib failed")
+
+    # Start from an empty cache and keep the -1 results below out of other tests
+    monkeypatch.setattr(emmet.core.utils, "_SG_CACHE", {})
+    monkeypatch.setattr(Structure, "get_space_group_info", _failing_sg_info)
+
+    # Failures are cached
+    struc = Structure(Lattice.cubic(3.17), ["Po"], [[0, 0, 0]])
+    assert get_sg(struc) == -1
+    assert get_sg(struc.copy()) == -1
+    assert len(calls) == 1
+
+    # Structures with magnetic moments skip the cache
+    struc = Structure(Lattice.cubic(3.17), ["Po"], [[0, 0, 0]])
+    struc.add_site_property("magmom", [1.0])
+    assert get_sg(struc) == -1
+    assert get_sg(struc) == -1
+    assert len(calls) == 3
+
+
+def test_group_structures():
+    """
+    Tests grouping structures by space group and structure matching
+    """
+    nacl = Structure.from_spacegroup(
+        "Fm-3m", Lattice.cubic(5.69), ["Na", "Cl"], [[0, 0, 0], [0.5, 0.5, 0.5]]
+    )
+    cscl = Structure.from_spacegroup(
+        "Pm-3m", Lattice.cubic(4.12), ["Cs", "Cl"], [[0, 0, 0], [0.5, 0.5, 0.5]]
+    )
+    po = Structure(Lattice.cubic(3.35), ["Po"], [[0, 0, 0]])
+    nacl_strained = nacl.copy()
+    nacl_strained.apply_strain(0.02)
+    cscl_strained = cscl.copy()
+    cscl_strained.apply_strain(0.02)
+
+    # Two matching pairs so the parallel path has more than one group to match
+    structures = [nacl, cscl, po, nacl_strained, cscl_strained]
+    groups = list(group_structures(structures))
+    assert sorted(len(g) for g in groups) == [1, 2, 2]
+
+    parallel_groups = list(group_structures(structures, nproc=2))
+    assert [[s.composition for s in g] for g in groups] == [
+        [s.composition for s in g] for g in parallel_groups
+    ]
+    # The caller's structures are returned, not copies from the worker processes
+    assert all(
+        any(s is orig for orig in structures) for g in parallel_groups for s in g
+    )
+
+
+def test_jsanitize_deep_nesting():
+    """
+    Tests that jsanitize handles nesting deeper than the recursion limit
+    """
+    d = {"a": 1}
+    for _ in range(5000):
+        d = {"a": [d, (1, 2.0)]}
+
+    clean = jsanitize(d)
+    for _ in range(5000):
+        assert clean["a"][1] == [1, 2.0]
+        clean = clean["a"][0]
+    assert clean == {"a": 1}
+
+
+def test_jsanitize_circular_reference():
+    d = {"a": [1, 2]}
+    d["self"] = [d]
+    with pytest.raises(ValueError, match="circular reference"):
+        jsanitize(d)
+
+    # Shared but non-circular references are fine
+    shared = [1, 2]
+    assert jsanitize({"a": shared, "b": [shared]}) == {"a": [1, 2], "b": [[1, 2]]}
+
+
 class GoodMSONClass(MSONable):
     def __init__(self, a, b, c, d=1, **kwargs):
         self.a = a
@@ -1,10 +1,13 @@
 import json
+from pathlib import Path
 
 import pytest
 from maggma.stores import JSONStore, MemoryStore
 from monty.io import zopen
+from monty.serialization import loadfn
 
 from emmet.core import SETTINGS
+import emmet.core.vasp.calc_types
 from emmet.core.vasp.calc_types import RunType, TaskType, run_type, task_type
 from emmet.core.vasp.task import TaskDocument
 from emmet.core.vasp.validation import ValidationDoc
@@ -33,6 +36,7 @@ def test_run_type():
     params_sets = [
         ("GGA", {"GGA": "--"}),
         ("GGA+U", {"GGA": "--", "LDAU": True}),
+        ("PBE", {"GGA": " pe "}),
         ("SCAN", {"METAGGA": "Scan"}),
         ("SCAN+U", {"METAGGA": "Scan", "LDAU": True}),
     ]
@@ -41,6 +45,17 @@ def test_run_type():
         assert run_type(params) == RunType(_type)
 
 
+def test_run_types_json():
+    # The JSON copy has to be regenerated whenever run_types.yaml changes
+    calc_types_dir = Path(emmet.core.vasp.calc_types.__file__).parent
+    with open(calc_types_dir / "run_types.json") as f:
+        json_data = json.load(f)
+    yaml_data = loadfn(calc_types_dir / "run_types.yaml")
+
+    # Key order decides which run type rule wins, so it has to match as well
+    assert json.dumps(json_data) == json.dumps(yaml_data)
+
+
 @pytest.fixture(scope="session")
 def tasks(test_dir):
     with zopen(test_dir / "test_si_tasks.json.gz") as f: